@@ -76,12 +76,14 @@ impl<C: ConfigureEvm, CS> HostExecutor<C, CS> {
 
         let current_block = C::Primitives::into_primitive_block(rpc_block.clone());
 
-        let previous_block = provider
+        // Only the previous block's state root is read, so skip fetching and decoding its full
+        // transaction list.
+        let previous_state_root = provider
             .get_block_by_number((block_number - 1).into())
-            .full()
             .await?
-            .ok_or(HostError::ExpectedBlock(block_number))
-            .map(C::Primitives::into_primitive_block)?;
+            .ok_or(HostError::ExpectedBlock(block_number))?
+            .header()
+            .state_root();
 
         // Setup the database for the block executor. The backend is a runtime choice (not a
         // cargo feature), so binaries sharing one build can fetch state differently.
@@ -91,7 +93,7 @@ impl<C: ConfigureEvm, CS> HostExecutor<C, CS> {
                 let rpc_db = rsp_rpc_db::BasicRpcDb::new(
                     provider.clone(),
                     block_number - 1,
-                    previous_block.header().state_root(),
+                    previous_state_root,
                 );
 
                 self.execute_with_db(
@@ -108,7 +110,7 @@ impl<C: ConfigureEvm, CS> HostExecutor<C, CS> {
                 let rpc_db = rsp_rpc_db::ExecutionWitnessRpcDb::new(
                     provider.clone(),
                     block_number - 1,
-                    previous_block.header().state_root(),
+                    previous_state_root,
                 )
                 .await?;
 
@@ -1,3 +1,5 @@
+use std::{error::Error, io};
+
 use alloy_json_rpc::RpcError;
 use alloy_provider::{Network, RootProvider};
 use alloy_rpc_client::RpcClient;
@@ -30,6 +32,19 @@ impl RetryPolicy for ServerErrorRetryPolicy {
             }
         }
 
+        // Dropped connections surface as custom transport errors with either a hyper error (e.g.
+        // a kept-alive connection closed mid-request) or the underlying I/O error (e.g. a refused
+        // or reset connection) somewhere in their source chain.
+        if let RpcError::Transport(TransportErrorKind::Custom(err)) = error {
+            let mut source = Some(err.as_ref() as &(dyn Error + 'static));
+            while let Some(err) = source {
+                if is_transient_connection_error(err) {
+                    return true;
+                }
+                source = err.source();
+            }
+        }
+
         false
     }
 
@@ -37,3 +52,177 @@ impl RetryPolicy for ServerErrorRetryPolicy {
         self.0.backoff_hint(error)
     }
 }
+
+fn is_transient_connection_error(err: &(dyn Error + 'static)) -> bool {
+    if let Some(hyper_error) = err.downcast_ref::<hyper::Error>() {
+        if hyper_error.is_incomplete_message() || hyper_error.is_closed() {
+            return true;
+        }
+    }
+
+    err.downcast_ref::<io::Error>().is_some_and(|io_error| is_transient_io_error(io_error.kind()))
+}
+
+fn is_transient_io_error(kind: io::ErrorKind) -> bool {
+    matches!(
+        kind,
+        io::ErrorKind::ConnectionRefused |
+            io::ErrorKind::ConnectionReset |
+            io::ErrorKind::ConnectionAborted |
+            io::ErrorKind::BrokenPipe
+    )
+}
+
+#[cfg(test)]
+mod tests {
+    use std::{
+        fmt,
+        sync::{
+            atomic::{AtomicUsize, Ordering},
+            Arc,
+        },
+    };
+
+    use alloy_provider::{network::Ethereum, Provider};
+    use tokio::{
+        io::{AsyncReadExt, AsyncWriteExt},
+        net::{TcpListener, TcpStream},
+    };
+
+    use super::*;
+
+    /// An error wrapping an I/O error as its source, the way HTTP client errors do.
+    #[derive(Debug)]
+    struct WrappedIoError(io::Error);
+
+    impl fmt::Display for WrappedIoError {
+        fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+            write!(f, "error sending request")
+        }
+    }
+
+    impl Error for WrappedIoError {
+        fn source(&self) -> Option<&(dyn Error + 'static)> {
+            Some(&self.0)
+        }
+    }
+
+    fn should_retry(error: &TransportError) -> bool {
+        ServerErrorRetryPolicy::default().should_retry(error)
+    }
+
+    /// Read one full HTTP request from `stream`, so closing it afterwards sends a clean FIN
+    /// rather than a reset for unread data.
+    async fn read_request(stream: &mut TcpStream) {
+        let mut request = Vec::new();
+        let mut buf = [0; 4096];
+        let header_end = loop {
+            let n = stream.read(&mut buf).await.unwrap();
+            assert!(n > 0, "connection closed before the request headers were read");
+            request.extend_from_slice(&buf[..n]);
+            if let Some(pos) = request.windows(4).position(|w| w == b"\r\n\r\n") {
+                break pos + 4;
+            }
+        };
+
+        let headers = String::from_utf8_lossy(&request[..header_end]).to_lowercase();
+        let content_length = headers
+            .lines()
+            .find_map(|line| line.strip_prefix("content-length:"))
+            .map(|len| len.trim().parse::<usize>().unwrap())
+            .unwrap_or_default();
+
+        while request.len() < header_end + content_length {
+            let n = stream.read(&mut buf).await.unwrap();
+            assert!(n > 0, "connection closed before the request body was read");
+            request.extend_from_slice(&buf[..n]);
+        }
+    }
+
+    /// Accept connections forever, answering each request with a truncated response head and
+    /// then closing the connection.
+    async fn serve_truncated_responses(listener: TcpListener, connections: Arc<AtomicUsize>) {
+        loop {
+            let (mut stream, _) = listener.accept().await.unwrap();
+            connections.fetch_add(1, Ordering::SeqCst);
+            read_request(&mut stream).await;
+            stream.write_all(b"HTTP/1.1 200 OK\r\n").await.unwrap();
+        }
+    }
+
+    #[test]
+    fn test_retries_transient_io_error() {
+        let error = TransportErrorKind::custom(io::Error::from(io::ErrorKind::ConnectionReset));
+
+        assert!(should_retry(&error));
+    }
+
+    #[test]
+    fn test_retries_nested_transient_io_error() {
+        let error = TransportErrorKind::custom(WrappedIoError(io::Error::from(
+            io::ErrorKind::ConnectionRefused,
+        )));
+
+        assert!(should_retry(&error));
+    }
+
+    #[test]
+    fn test_does_not_retry_non_transient_io_error() {
+        for kind in
+            [io::ErrorKind::InvalidData, io::ErrorKind::PermissionDenied, io::ErrorKind::TimedOut]
+        {
+            assert!(!should_retry(&TransportErrorKind::custom(io::Error::from(kind))));
+            assert!(!should_retry(&TransportErrorKind::custom(WrappedIoError(io::Error::from(
+                kind
+            )))));
+        }
+    }
+
+    #[test]
+    fn test_retries_server_errors() {
+        assert!(should_retry(&TransportErrorKind::http_error(500, String::new())));
+        assert!(should_retry(&TransportErrorKind::http_error(502, String::new())));
+        assert!(!should_retry(&TransportErrorKind::http_error(404, String::new())));
+    }
+
+    #[test]
+    fn test_retries_rate_limit() {
+        assert!(should_retry(&TransportErrorKind::http_error(429, String::new())));
+    }
+
+    /// A refused connection, as produced by the real HTTP transport, is retried.
+    #[tokio::test]
+    async fn test_retries_refused_connection() {
+        let listener = TcpListener::bind("127.0.0.1:0").await.unwrap();
+        let url = format!("http://{}", listener.local_addr().unwrap()).parse().unwrap();
+        drop(listener);
+
+        let provider = RootProvider::<Ethereum>::new_http(url);
+        let error = provider.get_block_number().await.unwrap_err();
+
+        assert!(should_retry(&error));
+    }
+
+    /// A connection closed before the response head completes surfaces as hyper's
+    /// `IncompleteMessage`, which carries no I/O error in its source chain, and is retried.
+    #[tokio::test]
+    async fn test_retries_connection_closed_mid_response() {
+        let listener = TcpListener::bind("127.0.0.1:0").await.unwrap();
+        let url: Url = format!("http://{}", listener.local_addr().unwrap()).parse().unwrap();
+        let connections = Arc::new(AtomicUsize::new(0));
+        let server = tokio::spawn(serve_truncated_responses(listener, connections.clone()));
+
+        // Without the retry layer, the policy itself must classify the error as transient.
+        let provider = RootProvider::<Ethereum>::new_http(url.clone());
+        let error = provider.get_block_number().await.unwrap_err();
+        assert!(should_retry(&error), "not retried: {error:?}");
+
+        // Through `create_provider`, each retry opens a fresh connection to the server.
+        connections.store(0, Ordering::SeqCst);
+        let provider = create_provider::<Ethereum>(url);
+        assert!(provider.get_block_number().await.is_err());
+        assert!(connections.load(Ordering::SeqCst) > 1);
+
+        server.abort();
+    }
+}
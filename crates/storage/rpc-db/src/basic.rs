@@ -11,6 +11,7 @@ use alloy_provider::{
     Network, Provider,
 };
 use async_trait::async_trait;
+use futures::stream::{self, StreamExt, TryStreamExt};
 use reth_storage_errors::{db::DatabaseError, provider::ProviderError};
 use revm_database::BundleState;
 use revm_database_interface::DatabaseRef;
@@ -22,6 +23,14 @@ use tracing::debug;
 
 use crate::{error::RpcDbError, RpcDb};
 
+/// The maximum number of independent RPC requests kept in flight at once, per database.
+///
+/// This bounds a single block's fan-out only. Services executing several blocks at once (e.g.
+/// `continuous` with `--max-concurrent-executions`) multiply it, so a provider can see up to
+/// `max_concurrent_executions * MAX_CONCURRENT_REQUESTS` concurrent requests; 429s beyond that
+/// are absorbed only by the retry policy in `rsp_provider::create_provider`.
+const MAX_CONCURRENT_REQUESTS: usize = 16;
+
 /// A database that fetches data from a [Provider] over a [Transport].
 #[derive(Debug, Clone)]
 pub struct BasicRpcDb<P, N> {
@@ -216,39 +225,61 @@ where
 
         // For every account we touched, fetch the storage proofs for all the slots we touched.
         tracing::info!("fetching storage proofs");
-        let mut before_storage_proofs = Vec::new();
-        let mut after_storage_proofs = Vec::new();
-
-        for (address, used_keys) in state_requests.iter() {
-            let modified_keys = bundle_state
-                .state
-                .get(address)
-                .map(|account| {
-                    account.storage.keys().map(|key| B256::from(*key)).collect::<BTreeSet<_>>()
-                })
-                .unwrap_or_default()
-                .into_iter()
-                .collect::<Vec<_>>();
 
-            let keys = used_keys
-                .iter()
-                .map(|key| B256::from(*key))
-                .chain(modified_keys.clone().into_iter())
-                .collect::<BTreeSet<_>>()
+        // Work out the slots to prove up front, so the in-flight requests below own everything
+        // they use instead of borrowing across the `Send` bound of the `async_trait` future.
+        let proof_requests = state_requests
+            .into_iter()
+            .map(|(address, used_keys)| {
+                let modified_keys = bundle_state
+                    .state
+                    .get(&address)
+                    .map(|account| {
+                        account.storage.keys().map(|key| B256::from(*key)).collect::<BTreeSet<_>>()
+                    })
+                    .unwrap_or_default()
+                    .into_iter()
+                    .collect::<Vec<_>>();
+
+                let keys = used_keys
+                    .iter()
+                    .map(|key| B256::from(*key))
+                    .chain(modified_keys.clone().into_iter())
+                    .collect::<BTreeSet<_>>()
+                    .into_iter()
+                    .collect::<Vec<_>>();
+
+                (address, keys, modified_keys)
+            })
+            .collect::<Vec<_>>();
+
+        // The proofs for each touched account are independent of every other account, so keep
+        // a bounded window of accounts in flight rather than one round trip at a time.
+        let (before_storage_proofs, after_storage_proofs): (Vec<_>, Vec<_>) =
+            stream::iter(proof_requests)
+                .map(|(address, keys, modified_keys)| {
+                    let provider = self.provider.clone();
+                    let block_number = self.block_number;
+                    async move {
+                        let before_storage_proof =
+                            provider.get_proof(address, keys).number(block_number).await?;
+
+                        let after_storage_proof = provider
+                            .get_proof(address, modified_keys)
+                            .number(block_number + 1)
+                            .await?;
+
+                        Ok::<_, RpcDbError>((
+                            eip1186_proof_to_account_proof(before_storage_proof),
+                            eip1186_proof_to_account_proof(after_storage_proof),
+                        ))
+                    }
+                })
+                .buffered(MAX_CONCURRENT_REQUESTS)
+                .try_collect::<Vec<_>>()
+                .await?
                 .into_iter()
-                .collect::<Vec<_>>();
-
-            let storage_proof =
-                self.provider.get_proof(*address, keys.clone()).number(self.block_number).await?;
-            before_storage_proofs.push(eip1186_proof_to_account_proof(storage_proof));
-
-            let storage_proof = self
-                .provider
-                .get_proof(*address, modified_keys)
-                .number(self.block_number + 1)
-                .await?;
-            after_storage_proofs.push(eip1186_proof_to_account_proof(storage_proof));
-        }
+                .unzip();
 
         let state = EthereumState::from_transition_proofs(
             self.state_root,
@@ -273,42 +304,169 @@ where
 
     async fn ancestor_headers(&self) -> Result<Vec<Header>, RpcDbError> {
         let oldest_ancestor = *self.oldest_ancestor.read().unwrap();
-        let mut ancestor_headers = vec![];
         tracing::info!("fetching {} ancestor headers", (self.block_number + 1) - oldest_ancestor);
-        for height in (oldest_ancestor..=(self.block_number)).rev() {
-            let block = self
-                .provider
-                .get_block_by_number(height.into())
-                .await?
-                .ok_or(RpcDbError::BlockNotFound(height))?;
-
-            ancestor_headers.push(Header {
-                parent_hash: block.header().parent_hash(),
-                ommers_hash: block.header().ommers_hash(),
-                beneficiary: block.header().beneficiary(),
-                state_root: block.header().state_root(),
-                transactions_root: block.header().transactions_root(),
-                receipts_root: block.header().receipts_root(),
-                logs_bloom: block.header().logs_bloom(),
-                difficulty: block.header().difficulty(),
-                number: block.header().number(),
-                gas_limit: block.header().gas_limit(),
-                gas_used: block.header().gas_used(),
-                timestamp: block.header().timestamp(),
-                extra_data: block.header().extra_data().clone(),
-                mix_hash: block.header().mix_hash().unwrap_or_default(),
-                nonce: block.header().nonce().unwrap_or_default(),
-                base_fee_per_gas: block.header().base_fee_per_gas(),
-                withdrawals_root: block.header().withdrawals_root(),
-                blob_gas_used: block.header().blob_gas_used(),
-                excess_blob_gas: block.header().excess_blob_gas(),
-                parent_beacon_block_root: block.header().parent_beacon_block_root(),
-                requests_hash: block.header().requests_hash(),
-                block_access_list_hash: None,
-                slot_number: None,
+
+        // The headers are independent reads, so keep a bounded window of requests in flight
+        // instead of paying a full round trip per block. `buffered` yields the results in the
+        // order the requests were issued, i.e. newest first.
+        let ancestor_headers = stream::iter((oldest_ancestor..=(self.block_number)).rev())
+            .map(|height| {
+                // Each request owns its provider handle, so the in-flight futures don't borrow
+                // `self` across the `Send` bound of the `async_trait` future.
+                let provider = self.provider.clone();
+                async move {
+                    let block = provider
+                        .get_block_by_number(height.into())
+                        .await?
+                        .ok_or(RpcDbError::BlockNotFound(height))?;
+
+                    Ok::<_, RpcDbError>(Header {
+                        parent_hash: block.header().parent_hash(),
+                        ommers_hash: block.header().ommers_hash(),
+                        beneficiary: block.header().beneficiary(),
+                        state_root: block.header().state_root(),
+                        transactions_root: block.header().transactions_root(),
+                        receipts_root: block.header().receipts_root(),
+                        logs_bloom: block.header().logs_bloom(),
+                        difficulty: block.header().difficulty(),
+                        number: block.header().number(),
+                        gas_limit: block.header().gas_limit(),
+                        gas_used: block.header().gas_used(),
+                        timestamp: block.header().timestamp(),
+                        extra_data: block.header().extra_data().clone(),
+                        mix_hash: block.header().mix_hash().unwrap_or_default(),
+                        nonce: block.header().nonce().unwrap_or_default(),
+                        base_fee_per_gas: block.header().base_fee_per_gas(),
+                        withdrawals_root: block.header().withdrawals_root(),
+                        blob_gas_used: block.header().blob_gas_used(),
+                        excess_blob_gas: block.header().excess_blob_gas(),
+                        parent_beacon_block_root: block.header().parent_beacon_block_root(),
+                        requests_hash: block.header().requests_hash(),
+                        block_access_list_hash: None,
+                        slot_number: None,
+                    })
+                }
+            })
+            .buffered(MAX_CONCURRENT_REQUESTS)
+            .try_collect::<Vec<_>>()
+            .await?;
+
+        Ok(ancestor_headers)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use std::time::Duration;
+
+    use alloy_provider::{network::Ethereum, RootProvider};
+    use serde_json::{json, Value};
+    use tokio::{
+        io::{AsyncReadExt, AsyncWriteExt},
+        net::{TcpListener, TcpStream},
+    };
+
+    use super::*;
+
+    /// Read one HTTP request from `stream` and return its body parsed as JSON.
+    async fn read_json_request(stream: &mut TcpStream) -> Value {
+        let mut request = Vec::new();
+        let mut buf = [0; 4096];
+        let header_end = loop {
+            let n = stream.read(&mut buf).await.unwrap();
+            assert!(n > 0, "connection closed before the request headers were read");
+            request.extend_from_slice(&buf[..n]);
+            if let Some(pos) = request.windows(4).position(|w| w == b"\r\n\r\n") {
+                break pos + 4;
+            }
+        };
+
+        let headers = String::from_utf8_lossy(&request[..header_end]).to_lowercase();
+        let content_length = headers
+            .lines()
+            .find_map(|line| line.strip_prefix("content-length:"))
+            .map(|len| len.trim().parse::<usize>().unwrap())
+            .unwrap_or_default();
+
+        while request.len() < header_end + content_length {
+            let n = stream.read(&mut buf).await.unwrap();
+            assert!(n > 0, "connection closed before the request body was read");
+            request.extend_from_slice(&buf[..n]);
+        }
+
+        serde_json::from_slice(&request[header_end..header_end + content_length]).unwrap()
+    }
+
+    /// A minimal block whose number is `height`, as returned by `eth_getBlockByNumber`.
+    fn block_json(height: u64) -> Value {
+        let zero_hash = format!("{:#066x}", 0);
+        json!({
+            "hash": format!("{height:#066x}"),
+            "parentHash": format!("{:#066x}", height.saturating_sub(1)),
+            "sha3Uncles": zero_hash,
+            "miner": format!("{:#042x}", 0),
+            "stateRoot": zero_hash,
+            "transactionsRoot": zero_hash,
+            "receiptsRoot": zero_hash,
+            "logsBloom": format!("0x{}", "00".repeat(256)),
+            "difficulty": "0x0",
+            "number": format!("{height:#x}"),
+            "gasLimit": "0x0",
+            "gasUsed": "0x0",
+            "timestamp": "0x0",
+            "extraData": "0x",
+            "mixHash": zero_hash,
+            "nonce": "0x0000000000000000",
+            "uncles": [],
+            "transactions": [],
+        })
+    }
+
+    /// Serve `eth_getBlockByNumber` over HTTP, delaying each response by an amount that varies
+    /// with the block number so the responses complete out of request order.
+    async fn serve_blocks(listener: TcpListener) {
+        loop {
+            let (mut stream, _) = listener.accept().await.unwrap();
+            tokio::spawn(async move {
+                let request = read_json_request(&mut stream).await;
+                let height = u64::from_str_radix(
+                    request["params"][0].as_str().unwrap().trim_start_matches("0x"),
+                    16,
+                )
+                .unwrap();
+                tokio::time::sleep(Duration::from_millis((height % 8) * 10)).await;
+
+                let body =
+                    json!({ "jsonrpc": "2.0", "id": request["id"], "result": block_json(height) })
+                        .to_string();
+                let response = format!(
+                    "HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n{body}",
+                    body.len()
+                );
+                stream.write_all(response.as_bytes()).await.unwrap();
             });
         }
+    }
 
-        Ok(ancestor_headers)
+    /// The client validates the ancestor hash chain walking backwards from the executed block, so
+    /// the headers must stay newest first and contiguous even though they are fetched
+    /// concurrently and complete out of order.
+    #[tokio::test]
+    async fn test_ancestor_headers_are_newest_first_and_contiguous() {
+        let listener = TcpListener::bind("127.0.0.1:0").await.unwrap();
+        let url = format!("http://{}", listener.local_addr().unwrap()).parse().unwrap();
+        let server = tokio::spawn(serve_blocks(listener));
+
+        let block_number = 100;
+        let oldest_ancestor = block_number - 40;
+        let db = BasicRpcDb::new(RootProvider::<Ethereum>::new_http(url), block_number, B256::ZERO);
+        *db.oldest_ancestor.write().unwrap() = oldest_ancestor;
+
+        let headers = RpcDb::<Ethereum>::ancestor_headers(&db).await.unwrap();
+        let numbers = headers.iter().map(|header| header.number).collect::<Vec<_>>();
+
+        assert_eq!(numbers, (oldest_ancestor..=block_number).rev().collect::<Vec<_>>());
+
+        server.abort();
     }
 }